@@ -4,6 +4,8 @@ import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
 from utils.format_helpers import format_currency, format_percentage, format_large_number
+from utils.data_processor import DataProcessor
+from components.tables import select_filter, narrow_range, value_bounds
 import logging
 from datetime import datetime, date
 
@@ -34,81 +36,68 @@ class AnalyticsComponent:
             with tab1:
                 st.header("Análisis de Contratos Activos")
 
-                # Filters
-                col1, col2, col3, col4 = st.columns(4)
-
-                filtered_active_df = active_df.copy()
-
-                with col1:
-                    if 'fecha_de_publicacion' in filtered_active_df.columns:
-                        min_date = pd.to_datetime(
-                            filtered_active_df['fecha_de_publicacion']).min()
-                        max_date = pd.to_datetime(
-                            filtered_active_df['fecha_de_publicacion']).max()
-                        date_range = st.date_input("Fecha de Publicación",
-                                                   value=(min_date.date(),
-                                                          max_date.date()),
-                                                   key="active_date_filter")
-                        if isinstance(date_range,
-                                      tuple) and len(date_range) == 2:
-                            start_date, end_date = date_range
-                            mask = (pd.to_datetime(
-                                filtered_active_df['fecha_de_publicacion']).dt.
-                                    date.between(start_date, end_date))
-                            filtered_active_df = filtered_active_df[mask]
-
-                with col2:
-                    if 'tipo_de_contrato' in filtered_active_df.columns:
-                        unique_types = filtered_active_df[
-                            'tipo_de_contrato'].dropna().unique()
-                        contract_types = ['Todos'] + sorted(
-                            unique_types.tolist())
-                        selected_type = st.selectbox('Tipo de Contrato',
-                                                     contract_types,
-                                                     key="active_type_filter")
-                        if selected_type != 'Todos':
-                            filtered_active_df = filtered_active_df[
-                                filtered_active_df['tipo_de_contrato'] ==
-                                selected_type]
-
-                with col3:
-                    if 'valor_del_contrato' in filtered_active_df.columns:
-                        min_val = float(
-                            filtered_active_df['valor_del_contrato'].min(
-                            )) / 1000000
-                        max_val = float(
-                            filtered_active_df['valor_del_contrato'].max(
-                            )) / 1000000
-                        value_range = st.slider('Valor (COP $Millones)',
-                                                min_value=min_val,
-                                                max_value=max_val,
-                                                value=(min_val, max_val),
-                                                format="$%d",
-                                                key="active_value_filter")
-                        filtered_active_df = filtered_active_df[
-                            (filtered_active_df['valor_del_contrato'] >=
-                             value_range[0] * 1000000)
-                            & (filtered_active_df['valor_del_contrato'] <=
-                               value_range[1] * 1000000)]
-
-                with col4:
-                    if 'nombre_entidad' in filtered_active_df.columns:
-                        unique_entities = filtered_active_df[
-                            'nombre_entidad'].dropna().unique()
-                        entities = ['Todos'] + sorted(unique_entities.tolist())
-                        selected_entity = st.selectbox(
-                            'Entidad', entities, key="active_entity_filter")
-                        if selected_entity != 'Todos':
-                            filtered_active_df = filtered_active_df[
-                                filtered_active_df['nombre_entidad'] ==
-                                selected_entity]
+                # Filters (batched in a form so widgets rerun the page only on submit);
+                # each one narrows a single row mask and the frame is sliced once at the end
+                mask = np.ones(len(active_df), dtype=bool)
+
+                with st.form("active_filters"):
+                    col1, col2, col3, col4 = st.columns(4)
+
+                    with col1:
+                        if 'fecha_de_publicacion' in active_df.columns:
+                            min_date, max_date = DataProcessor.get_filter_domains(
+                                active_df, 'active')['date_ranges']['fecha_de_publicacion']
+                            date_range = st.date_input("Fecha de Publicación",
+                                                       value=(min_date.date(),
+                                                              max_date.date()),
+                                                       key="active_date_filter")
+                            if isinstance(date_range,
+                                          tuple) and len(date_range) == 2:
+                                start_date, end_date = date_range
+                                # Compare datetimes directly; the end date is inclusive
+                                mask = narrow_range(
+                                    mask, active_df['fecha_de_publicacion'].to_numpy(),
+                                    np.datetime64(start_date),
+                                    np.datetime64(end_date) + np.timedelta64(1, 'D'),
+                                    upper=np.less)
+
+                    with col2:
+                        if 'tipo_de_contrato' in active_df.columns:
+                            mask = select_filter(active_df, 'tipo_de_contrato',
+                                                 'Tipo de Contrato',
+                                                 "active_type_filter", mask)
+
+                    with col3:
+                        if 'valor_del_contrato' in active_df.columns and mask.any():
+                            values = active_df['valor_del_contrato'].to_numpy(
+                                dtype='float64', na_value=np.nan)
+                            min_val, max_val = value_bounds(values[mask])
+                            min_val, max_val = min_val / 1000000, max_val / 1000000
+                            value_range = st.slider('Valor (COP $Millones)',
+                                                    min_value=min_val,
+                                                    max_value=max_val,
+                                                    value=(min_val, max_val),
+                                                    format="$%d",
+                                                    key="active_value_filter")
+                            mask = narrow_range(mask, values,
+                                                value_range[0] * 1000000,
+                                                value_range[1] * 1000000)
+
+                    with col4:
+                        if 'nombre_entidad' in active_df.columns:
+                            mask = select_filter(active_df, 'nombre_entidad', 'Entidad',
+                                                 "active_entity_filter", mask)
+
+                    st.form_submit_button("Aplicar Filtros")
+
+                filtered_active_df = active_df[mask]
 
                 # Charts for Active Contracts
 
                 # Top 10 entities by contract value
                 if not filtered_active_df.empty:
                     entity_values = filtered_active_df.groupby(
-                        'nombre_entidad')['valor_del_contrato'].sum()
+                        'nombre_entidad', observed=True)['valor_del_contrato'].sum()
                     top_entities = entity_values.nlargest(10)
 
                     fig = px.bar(
@@ -129,7 +118,7 @@ class AnalyticsComponent:
                 # Regions with highest contract value
                 if 'departamento' in filtered_active_df.columns and not filtered_active_df.empty:
                     dept_values = filtered_active_df.groupby(
-                        'departamento')['valor_del_contrato'].sum()
+                        'departamento', observed=True)['valor_del_contrato'].sum()
                     region_values = dept_values.sort_values(ascending=True)
 
                     fig = px.bar(x=region_values.values,
@@ -150,92 +139,73 @@ class AnalyticsComponent:
             with tab2:
                 st.header("Análisis de Contratos Históricos")
 
-                # Filters
-                col1, col2, col3, col4, col5 = st.columns(5)
-
-                filtered_hist_df = historical_df.copy()
-
-                with col1:
-                    if 'fecha_de_firma' in filtered_hist_df.columns:
-                        min_date = pd.to_datetime(
-                            filtered_hist_df['fecha_de_firma']).min()
-                        max_date = pd.to_datetime(
-                            filtered_hist_df['fecha_de_firma']).max()
-                        date_range = st.date_input("Fecha de Firma",
-                                                   value=(min_date.date(),
-                                                          max_date.date()),
-                                                   key="hist_date_filter")
-                        if isinstance(date_range,
-                                      tuple) and len(date_range) == 2:
-                            start_date, end_date = date_range
-                            mask = (pd.to_datetime(
-                                filtered_hist_df['fecha_de_firma']).dt.date.
-                                    between(start_date, end_date))
-                            filtered_hist_df = filtered_hist_df[mask]
-
-                with col2:
-                    if 'tipo_de_contrato' in filtered_hist_df.columns:
-                        unique_types = filtered_hist_df[
-                            'tipo_de_contrato'].dropna().unique()
-                        contract_types = ['Todos'] + sorted(
-                            unique_types.tolist())
-                        selected_type = st.selectbox('Tipo de Contrato',
-                                                     contract_types,
-                                                     key="hist_type_filter")
-                        if selected_type != 'Todos':
-                            filtered_hist_df = filtered_hist_df[
-                                filtered_hist_df['tipo_de_contrato'] ==
-                                selected_type]
-
-                with col3:
-                    if 'valor_del_contrato' in filtered_hist_df.columns:
-                        min_val = float(filtered_hist_df['valor_del_contrato'].
-                                        min()) / 1000000
-                        max_val = float(filtered_hist_df['valor_del_contrato'].
-                                        max()) / 1000000
-                        value_range = st.slider('Valor (COP $Millones)',
-                                                min_value=min_val,
-                                                max_value=max_val,
-                                                value=(min_val, max_val),
-                                                format="$%d",
-                                                key="hist_value_filter")
-                        filtered_hist_df = filtered_hist_df[
-                            (filtered_hist_df['valor_del_contrato'] >=
-                             value_range[0] * 1000000)
-                            & (filtered_hist_df['valor_del_contrato'] <=
-                               value_range[1] * 1000000)]
-
-                with col4:
-                    if 'nombre_entidad' in filtered_hist_df.columns:
-                        unique_entities = filtered_hist_df[
-                            'nombre_entidad'].dropna().unique()
-                        entities = ['Todos'] + sorted(unique_entities.tolist())
-                        selected_entity = st.selectbox(
-                            'Entidad', entities, key="hist_entity_filter")
-                        if selected_entity != 'Todos':
-                            filtered_hist_df = filtered_hist_df[
-                                filtered_hist_df['nombre_entidad'] ==
-                                selected_entity]
-
-                with col5:
-                    if 'proveedor_adjudicado' in filtered_hist_df.columns:
-                        unique_providers = filtered_hist_df[
-                            'proveedor_adjudicado'].dropna().unique()
-                        providers = ['Todos'] + sorted(
-                            unique_providers.tolist())
-                        selected_provider = st.selectbox(
-                            'Proveedor', providers, key="hist_provider_filter")
-                        if selected_provider != 'Todos':
-                            filtered_hist_df = filtered_hist_df[
-                                filtered_hist_df['proveedor_adjudicado'] ==
-                                selected_provider]
+                # Filters (batched in a form so widgets rerun the page only on submit);
+                # each one narrows a single row mask and the frame is sliced once at the end
+                mask = np.ones(len(historical_df), dtype=bool)
+
+                with st.form("hist_filters"):
+                    col1, col2, col3, col4, col5 = st.columns(5)
+
+                    with col1:
+                        if 'fecha_de_firma' in historical_df.columns:
+                            min_date, max_date = DataProcessor.get_filter_domains(
+                                historical_df, 'historical')['date_ranges']['fecha_de_firma']
+                            date_range = st.date_input("Fecha de Firma",
+                                                       value=(min_date.date(),
+                                                              max_date.date()),
+                                                       key="hist_date_filter")
+                            if isinstance(date_range,
+                                          tuple) and len(date_range) == 2:
+                                start_date, end_date = date_range
+                                # Compare datetimes directly; the end date is inclusive
+                                mask = narrow_range(
+                                    mask, historical_df['fecha_de_firma'].to_numpy(),
+                                    np.datetime64(start_date),
+                                    np.datetime64(end_date) + np.timedelta64(1, 'D'),
+                                    upper=np.less)
+
+                    with col2:
+                        if 'tipo_de_contrato' in historical_df.columns:
+                            mask = select_filter(historical_df, 'tipo_de_contrato',
+                                                 'Tipo de Contrato',
+                                                 "hist_type_filter", mask)
+
+                    with col3:
+                        if 'valor_del_contrato' in historical_df.columns and mask.any():
+                            values = historical_df['valor_del_contrato'].to_numpy(
+                                dtype='float64', na_value=np.nan)
+                            min_val, max_val = value_bounds(values[mask])
+                            min_val, max_val = min_val / 1000000, max_val / 1000000
+                            value_range = st.slider('Valor (COP $Millones)',
+                                                    min_value=min_val,
+                                                    max_value=max_val,
+                                                    value=(min_val, max_val),
+                                                    format="$%d",
+                                                    key="hist_value_filter")
+                            mask = narrow_range(mask, values,
+                                                value_range[0] * 1000000,
+                                                value_range[1] * 1000000)
+
+                    with col4:
+                        if 'nombre_entidad' in historical_df.columns:
+                            mask = select_filter(historical_df, 'nombre_entidad', 'Entidad',
+                                                 "hist_entity_filter", mask)
+
+                    with col5:
+                        if 'proveedor_adjudicado' in historical_df.columns:
+                            mask = select_filter(historical_df, 'proveedor_adjudicado',
+                                                 'Proveedor', "hist_provider_filter", mask)
+
+                    st.form_submit_button("Aplicar Filtros")
+
+                filtered_hist_df = historical_df[mask]
 
                 # Charts for Historical Contracts
 
                 # Top 10 entities by contract value
                 if not filtered_hist_df.empty:
                     entity_values = filtered_hist_df.groupby(
-                        'nombre_entidad')['valor_del_contrato'].sum()
+                        'nombre_entidad', observed=True)['valor_del_contrato'].sum()
                     top_entities = entity_values.nlargest(10)
 
                     fig = px.bar(
@@ -256,7 +226,7 @@ class AnalyticsComponent:
                 # Regions with highest contract value
                 if 'departamento' in filtered_hist_df.columns and not filtered_hist_df.empty:
                     dept_values = filtered_hist_df.groupby(
-                        'departamento')['valor_del_contrato'].sum()
+                        'departamento', observed=True)['valor_del_contrato'].sum()
                     region_values = dept_values.sort_values(ascending=True)
 
                     fig = px.bar(x=region_values.values,
@@ -276,7 +246,7 @@ class AnalyticsComponent:
                 # Top providers by contract value
                 if 'proveedor_adjudicado' in filtered_hist_df.columns and not filtered_hist_df.empty:
                     provider_values = filtered_hist_df.groupby(
-                        'proveedor_adjudicado')['valor_del_contrato'].sum()
+                        'proveedor_adjudicado', observed=True)['valor_del_contrato'].sum()
                     top_providers = provider_values.nlargest(10)
 
                     fig = px.bar(
@@ -297,25 +267,16 @@ class AnalyticsComponent:
                 # Inside the historical contracts tab section
                 if 'fecha_de_firma' in filtered_hist_df.columns and not filtered_hist_df.empty:
                     # Convert fecha_de_firma to datetime if not already
-                    filtered_hist_df['fecha_de_firma'] = pd.to_datetime(
-                        filtered_hist_df['fecha_de_firma'])
-
-                    # Group by month and sum contract values
-                    monthly_values = filtered_hist_df.groupby(
-                        filtered_hist_df['fecha_de_firma'].dt.strftime(
-                            '%Y-%m')  # Changed format to YYYY-MM
-                    )['valor_del_contrato'].sum().reset_index()
-
-                    # Add a datetime column for proper sorting
-                    monthly_values['month_dt'] = pd.to_datetime(
-                        monthly_values['fecha_de_firma'] + '-01')
-
-                    # Sort by the datetime column
-                    monthly_values = monthly_values.sort_values('month_dt')
-
-                    # Format the display labels after sorting
+                    dates = filtered_hist_df['fecha_de_firma']
+                    if not pd.api.types.is_datetime64_any_dtype(dates):
+                        dates = pd.to_datetime(dates)
+
+                    # Group by month and sum contract values; grouping on monthly periods keeps
+                    # the rows typed and sorted, so only the month labels are formatted as text
+                    monthly_values = filtered_hist_df['valor_del_contrato'].groupby(
+                        dates.dt.to_period('M').rename('fecha_de_firma')).sum().reset_index()
                     monthly_values['fecha_de_firma'] = monthly_values[
-                        'month_dt'].dt.strftime('%B-%Y')
+                        'fecha_de_firma'].dt.strftime('%B-%Y')
 
                     # Create line chart
                     fig = px.line(monthly_values,
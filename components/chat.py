@@ -9,6 +9,52 @@ import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# Columns read by get_context_data; everything else is dropped before hashing/caching
+ACTIVE_CONTEXT_COLUMNS = ['fecha_de_recepcion_de', 'tipo_de_contrato']
+HISTORICAL_CONTEXT_COLUMNS = ['valor_del_contrato', 'proveedor_adjudicado', 'nombre_entidad',
+                              'departamento', 'fecha_de_firma', 'id_contrato', 'tipo_de_contrato']
+
+
+def top_k(series: pd.Series, k: int) -> pd.Series:
+    """Return the k largest values of a series like series.nlargest(k), without a full sort"""
+    if series.hasnans:
+        series = series.dropna()
+    arr = series.to_numpy()
+    if len(arr) <= k:
+        return series.sort_values(ascending=False, kind='stable')
+    # Keep every value tied with the k-th largest so the cut can't drop one arbitrarily,
+    # then break ties by position like nlargest's keep='first'
+    kth = np.partition(arr, -k)[-k]
+    idx = np.flatnonzero(arr >= kth)
+    idx = idx[np.argsort(-arr[idx], kind='stable')][:k]
+    return series.iloc[idx]
+
+
+def format_ranking(series: pd.Series, value_format: str) -> str:
+    """Format a ranked series as '- label: value' bullet lines"""
+    labels = series.index.astype(str).to_numpy()
+    values = series.to_numpy().tolist()
+    return "\n".join([f"- {labels[i]}: {value_format.format(values[i])}" for i in range(len(values))])
+
+
+def trend_stats(values: np.ndarray) -> tuple:
+    """Return the last value, previous value, mean of the last 3 and mean of the 3 before those"""
+    tail = values[-6:]
+    return tail[-1], tail[-2], np.nanmean(tail[-3:]), np.nanmean(tail[:3])
+
+
+@st.cache_resource
+def get_model(api_key: str):
+    """Configure Gemini and build the model once per process; only chat sessions carry state"""
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel('gemini-pro')
+
+
+def project_columns(df: pd.DataFrame, columns: list) -> pd.DataFrame:
+    """Keep only the listed columns that are present in the dataframe"""
+    return df[[col for col in columns if col in df.columns]]
+
+
 class ChatComponent:
     def __init__(self):
         """Initialize the chat component with Google's Gemini AI"""
@@ -17,15 +63,27 @@ class ChatComponent:
             if not api_key:
                 raise ValueError("Google API key not found in environment variables")
             
-            genai.configure(api_key=api_key)
-            self.model = genai.GenerativeModel('gemini-pro')
+            self.model = get_model(api_key)
             self.chat = self.model.start_chat(history=[])
+            self._context_prompt_tpl = (
+                "Por favor, analiza el siguiente contexto del sistema de contratos y ayúdame a responder preguntas sobre los contratos:\n\n"
+                "{context}\n\n"
+                "Por favor, ten en cuenta este contexto para responder preguntas sobre:\n"
+                "- Análisis de tendencias y patrones en valores y frecuencias de contratos\n"
+                "- Comparaciones con datos históricos por región y proveedor\n"
+                "- Recomendaciones basadas en el comportamiento histórico de proveedores y entidades\n"
+                "- Identificación de oportunidades y riesgos basados en tendencias\n"
+                "- Análisis de distribución regional y temporal de contratos\n\n"
+                "Primera pregunta del usuario: {user_input}"
+            )
             logger.info("ChatComponent initialized successfully")
         except Exception as e:
             logger.error(f"Error initializing ChatComponent: {str(e)}")
             raise
 
-    def get_context_data(self, active_df: pd.DataFrame, historical_df: pd.DataFrame) -> str:
+    @staticmethod
+    @st.cache_data(ttl=1800, max_entries=128)  # Share context across sessions for 30 minutes
+    def get_context_data(active_df: pd.DataFrame, historical_df: pd.DataFrame) -> str:
         """Get comprehensive context about active and historical contracts"""
         try:
             today = pd.Timestamp.now().date()
@@ -41,16 +99,18 @@ class ChatComponent:
             active_section = f"""
             Contratos Activos con Fecha de Presentación Futura:
             - Total de contratos: {len(future_contracts)}
-            - Tipos de contratos principales: {', '.join(future_contracts['tipo_de_contrato'].value_counts().nlargest(3).index.tolist()) if not future_contracts.empty else 'N/A'}
+            - Tipos de contratos principales: {', '.join(future_contracts['tipo_de_contrato'].value_counts().loc[lambda counts: counts > 0].head(3).index.tolist()) if not future_contracts.empty else 'N/A'}
             """
             context_parts.append(active_section)
 
             # Historical Analytics Section
             if not historical_df.empty:
+                valor_arr = (historical_df['valor_del_contrato'].to_numpy(dtype='float64', na_value=np.nan)
+                             if 'valor_del_contrato' in historical_df.columns else np.empty(0))
                 hist_analytics = {
                     'total_contracts': len(historical_df),
-                    'avg_value': historical_df['valor_del_contrato'].mean() if 'valor_del_contrato' in historical_df.columns else 0,
-                    'total_value': historical_df['valor_del_contrato'].sum() if 'valor_del_contrato' in historical_df.columns else 0
+                    'avg_value': np.nanmean(valor_arr) if valor_arr.size else 0,
+                    'total_value': np.nansum(valor_arr)
                 }
 
                 hist_section = f"""
@@ -63,48 +123,53 @@ class ChatComponent:
 
                 # Top 10 Suppliers
                 if 'proveedor_adjudicado' in historical_df.columns and 'valor_del_contrato' in historical_df.columns:
-                    top_suppliers = historical_df.groupby('proveedor_adjudicado')['valor_del_contrato'].sum().nlargest(10)
+                    top_suppliers = top_k(historical_df.groupby('proveedor_adjudicado', observed=True)['valor_del_contrato'].sum(), 10)
                     suppliers_section = """
                     Top 10 Proveedores por Valor Total de Contratos:
-                    """ + "\n".join([f"- {name}: ${value:,.2f}" for name, value in top_suppliers.items()])
+                    """ + format_ranking(top_suppliers, "${:,.2f}")
                     context_parts.append(suppliers_section)
 
                 # Top 10 Entities
                 if 'nombre_entidad' in historical_df.columns and 'valor_del_contrato' in historical_df.columns:
-                    top_entities = historical_df.groupby('nombre_entidad')['valor_del_contrato'].sum().nlargest(10)
+                    top_entities = top_k(historical_df.groupby('nombre_entidad', observed=True)['valor_del_contrato'].sum(), 10)
                     entities_section = """
                     Top 10 Entidades por Valor Total de Contratos:
-                    """ + "\n".join([f"- {name}: ${value:,.2f}" for name, value in top_entities.items()])
+                    """ + format_ranking(top_entities, "${:,.2f}")
                     context_parts.append(entities_section)
 
+                # Monthly statistics shared by the frequency and trend sections
+                monthly_stats = pd.DataFrame()
+                if 'fecha_de_firma' in historical_df.columns:
+                    monthly_aggs = {col: agg for col, agg in (('id_contrato', 'count'), ('valor_del_contrato', 'mean'))
+                                    if col in historical_df.columns}
+                    if monthly_aggs:
+                        year_month = pd.to_datetime(historical_df['fecha_de_firma']).dt.to_period('M')
+                        monthly_stats = historical_df.groupby(year_month).agg(monthly_aggs)
+
                 # Monthly Contract Frequency
-                if 'fecha_de_firma' in historical_df.columns and 'id_contrato' in historical_df.columns:
-                    monthly_contracts = historical_df.groupby(
-                        pd.to_datetime(historical_df['fecha_de_firma']).dt.strftime('%Y-%m')
-                    )['id_contrato'].count()
-                    peak_months = monthly_contracts.nlargest(5)
+                if 'id_contrato' in monthly_stats.columns:
+                    monthly_contracts = monthly_stats['id_contrato']
+                    peak_months = top_k(monthly_contracts, 5)
                     
                     frequency_section = """
                     Frecuencia de Contratos por Mes (Top 5 meses con más contratos):
-                    """ + "\n".join([f"- {month}: {count} contratos" for month, count in peak_months.items()])
+                    """ + format_ranking(peak_months, "{} contratos")
                     context_parts.append(frequency_section)
 
                 # Regional Distribution
                 if 'departamento' in historical_df.columns and 'valor_del_contrato' in historical_df.columns:
-                    region_distribution = historical_df.groupby('departamento')['valor_del_contrato'].sum().nlargest(5)
+                    region_distribution = top_k(historical_df.groupby('departamento', observed=True)['valor_del_contrato'].sum(), 5)
                     region_section = """
                     Distribución Regional de Contratos (Top 5 departamentos):
-                    """ + "\n".join([f"- {dept}: ${value:,.2f}" for dept, value in region_distribution.items()])
+                    """ + format_ranking(region_distribution, "${:,.2f}")
                     context_parts.append(region_section)
 
                 # Contract Value Trends
-                if 'fecha_de_firma' in historical_df.columns and 'valor_del_contrato' in historical_df.columns:
-                    historical_df['year_month'] = pd.to_datetime(historical_df['fecha_de_firma']).dt.to_period('M')
-                    monthly_values = historical_df.groupby('year_month')['valor_del_contrato'].mean()
+                if 'valor_del_contrato' in monthly_stats.columns and len(monthly_stats) >= 2:
+                    last_value, previous_value, avg_recent, avg_previous = trend_stats(
+                        monthly_stats['valor_del_contrato'].to_numpy(dtype='float64'))
                     
-                    recent_trend = "creciente" if monthly_values.iloc[-1] > monthly_values.iloc[-2] else "decreciente"
-                    avg_recent = monthly_values.tail(3).mean()
-                    avg_previous = monthly_values.tail(6).head(3).mean()
+                    recent_trend = "creciente" if last_value > previous_value else "decreciente"
                     trend_strength = "fuerte" if abs(avg_recent - avg_previous)/avg_previous > 0.1 else "moderada"
                     
                     trend_section = f"""
@@ -120,8 +185,20 @@ class ChatComponent:
             
             return context
         except Exception as e:
+            # Re-raise so st.cache_data doesn't memoize the failure for every session
             logger.error(f"Error getting context data: {str(e)}")
-            return "Error al obtener el contexto de los contratos."
+            raise
+
+    @staticmethod
+    def stream_response(chat, prompt: str) -> str:
+        """Send a message and render the reply incrementally as chunks arrive"""
+        response = chat.send_message(prompt, stream=True)
+        placeholder = st.empty()
+        parts = []
+        for chunk in response:
+            parts.append(chunk.text)
+            placeholder.markdown("".join(parts))
+        return "".join(parts)
 
     @staticmethod
     def render_chat(active_df: Optional[pd.DataFrame] = None, 
@@ -139,15 +216,24 @@ class ChatComponent:
                     st.error(f"Error al conectar con Gemini AI: {str(e)}")
                     return
 
+            chat_component = st.session_state.chat_component
+            chat = getattr(chat_component, 'chat', None)
+
             # Initialize context in session state if not present
             if 'chat_context' not in st.session_state and active_df is not None and historical_df is not None:
-                st.session_state.chat_context = st.session_state.chat_component.get_context_data(active_df, historical_df)
+                try:
+                    st.session_state.chat_context = chat_component.get_context_data(
+                        project_columns(active_df, ACTIVE_CONTEXT_COLUMNS),
+                        project_columns(historical_df, HISTORICAL_CONTEXT_COLUMNS))
+                except Exception:
+                    # Already logged; only this session falls back to the error context
+                    st.session_state.chat_context = "Error al obtener el contexto de los contratos."
                 st.session_state.context_sent = False
 
             # Add clear chat history button
             if st.button("Limpiar Historial de Chat"):
-                if hasattr(st.session_state.chat_component, 'chat'):
-                    st.session_state.chat_component.chat = st.session_state.chat_component.model.start_chat(history=[])
+                if chat is not None:
+                    chat_component.chat = chat_component.model.start_chat(history=[])
                     st.session_state.context_sent = False
                     st.success("Historial de chat limpiado")
                     st.rerun()
@@ -160,33 +246,21 @@ class ChatComponent:
                 with st.spinner("Procesando tu pregunta..."):
                     # For the first message, prepend the context
                     if not st.session_state.get('context_sent', False):
-                        context_prompt = f"""
-                        Por favor, analiza el siguiente contexto del sistema de contratos y ayúdame a responder preguntas sobre los contratos:
-
-                        {st.session_state.chat_context}
-
-                        Por favor, ten en cuenta este contexto para responder preguntas sobre:
-                        - Análisis de tendencias y patrones en valores y frecuencias de contratos
-                        - Comparaciones con datos históricos por región y proveedor
-                        - Recomendaciones basadas en el comportamiento histórico de proveedores y entidades
-                        - Identificación de oportunidades y riesgos basados en tendencias
-                        - Análisis de distribución regional y temporal de contratos
-
-                        Primera pregunta del usuario: {user_input}
-                        """
-                        response = st.session_state.chat_component.chat.send_message(context_prompt)
-                        st.session_state.context_sent = True
+                        prompt = chat_component._context_prompt_tpl.format(
+                            context=st.session_state.chat_context,
+                            user_input=user_input)
                     else:
                         # For subsequent messages, just send the user input
-                        response = st.session_state.chat_component.chat.send_message(user_input)
+                        prompt = user_input
                     
                     st.markdown("### Respuesta:")
-                    st.markdown(response.text)
+                    ChatComponent.stream_response(chat, prompt)
+                    st.session_state.context_sent = True
             
             # Display chat history
-            if hasattr(st.session_state.chat_component, 'chat') and st.session_state.chat_component.chat.history:
+            if chat is not None and chat.history:
                 st.markdown("### Historial de Chat")
-                for message in st.session_state.chat_component.chat.history[1:]:  # Skip the initial context message
+                for message in chat.history[1:]:  # Skip the initial context message
                     role = "🤖 IA" if message.role == "model" else "👤 Usuario"
                     with st.container():
                         st.markdown(f"**{role}:**")
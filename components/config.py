@@ -3,45 +3,103 @@ import json
 import os
 import logging
 
+try:
+    import orjson
+except ImportError:  # environments installed before orjson was a dependency use the stdlib
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+_DEFAULT_KEYWORDS = (
+    "Estudio de demanda", "Plan Maestro de Movilidad",
+    "Estudio de movilidad", "Plan infraestructura",
+    "plan local de seguridad vial", "Plan intermodal",
+    "Modelo de transporte", "Encuesta origen destino",
+    "Toma informacion de campo", "Caracterizacion de vías",
+    "Estudio de tránsito", "Diseño Señalización"
+)
+
+_DEFAULT_CONFIG = {
+    "codeCategory": "V1.811022%",
+    "useFilterKeywords": True,
+    "keywords": list(_DEFAULT_KEYWORDS),
+    "notification_recipients": []
+}
+
+
+def _loads(data: bytes) -> dict:
+    """Decode JSON bytes with orjson when installed"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _dumps(config: dict) -> bytes:
+    """Encode config as indented JSON bytes with orjson when installed"""
+    if orjson is not None:
+        return orjson.dumps(config, option=orjson.OPT_INDENT_2)
+    return json.dumps(config, indent=2).encode()
+
+
+def _clean_lines(text: str) -> list:
+    """Split text into stripped, non-empty, de-duplicated lines, preserving order"""
+    return list(dict.fromkeys(s for s in (line.strip() for line in text.split("\n")) if s))
+
+
+@st.cache_data(show_spinner=False)
+def _load_config_cached(config_file: str, mtime: float) -> dict:
+    """Parse the config file over the defaults; mtime only keys the cache (0.0 means no file)"""
+    # Fresh lists so the shared defaults are never mutated through the returned dict
+    config = {**_DEFAULT_CONFIG, "keywords": list(_DEFAULT_KEYWORDS), "notification_recipients": []}
+
+    if mtime:
+        with open(config_file, 'rb') as f:
+            file_config = _loads(f.read())
+        if not isinstance(file_config, dict):
+            raise ValueError(f"expected a JSON object, got {type(file_config).__name__}")
+        config.update(file_config)
+
+    return config
+
+
 class ConfigComponent:
     @staticmethod
     def load_config():
-        """Load configuration from file"""
+        """Load configuration from file, re-reading it only when it changes on disk"""
+        config_file = "config.json"
         try:
-            config_file = "config.json"
-            default_config = {
-                "codeCategory": "V1.811022%",
-                "useFilterKeywords": True,
-                "keywords": [
-                    "Estudio de demanda", "Plan Maestro de Movilidad",
-                    "Estudio de movilidad", "Plan infraestructura",
-                    "plan local de seguridad vial", "Plan intermodal",
-                    "Modelo de transporte", "Encuesta origen destino",
-                    "Toma informacion de campo", "Caracterizacion de vías",
-                    "Estudio de tránsito", "Diseño Señalización"
-                ],
-                "notification_recipients": []
-            }
-            
-            if os.path.exists(config_file):
-                with open(config_file, 'r') as f:
-                    file_config = json.load(f)
-                    default_config.update(file_config)
-                    
-            return default_config
-        except Exception as e:
+            # A single stat both detects a missing file and keys the cache
+            return _load_config_cached(config_file, os.stat(config_file).st_mtime)
+        except FileNotFoundError:
+            logger.debug("No config file found, using defaults")
+        except (OSError, ValueError) as e:
             logger.error(f"Error loading config: {str(e)}")
-            return default_config
+        return _load_config_cached(config_file, 0.0)
 
     @staticmethod
     def save_config(config):
         """Save configuration to file"""
         try:
             config_file = "config.json"
-            with open(config_file, 'w') as f:
-                json.dump(config, f, indent=2)
+            payload = _dumps(config)
+            try:
+                with open(config_file, 'rb') as f:
+                    unchanged = f.read() == payload
+            except FileNotFoundError:
+                unchanged = False
+            if unchanged:
+                # Nothing to write; keep the file and the loader cache as they are
+                return True
+            # Write a temp file and rename it over the config so readers never see a partial file
+            tmp_file = f"{config_file}.tmp"
+            fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                os.write(fd, payload)
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            os.replace(tmp_file, config_file)
+            _load_config_cached.clear()
             return True
         except Exception as e:
             logger.error(f"Error saving config: {str(e)}")
@@ -64,12 +122,12 @@ class ConfigComponent:
                     
                     code_category = st.text_input(
                         "Código de Categoría",
-                        value=config.get("codeCategory", "V1.811022%")
+                        value=config.get("codeCategory", _DEFAULT_CONFIG["codeCategory"])
                     )
                     
                     use_keywords = st.checkbox(
                         "Usar filtro de palabras clave",
-                        value=config.get("useFilterKeywords", True)
+                        value=config.get("useFilterKeywords", _DEFAULT_CONFIG["useFilterKeywords"])
                     )
                     
                     keywords = st.text_area(
@@ -82,7 +140,7 @@ class ConfigComponent:
                         new_config.update({
                             "codeCategory": code_category,
                             "useFilterKeywords": use_keywords,
-                            "keywords": [k.strip() for k in keywords.split("\n") if k.strip()]
+                            "keywords": _clean_lines(keywords)
                         })
                         
                         if ConfigComponent.save_config(new_config):
@@ -105,9 +163,7 @@ class ConfigComponent:
                 # Save button
                 if st.button("Guardar Destinatarios"):
                     new_config = config.copy()
-                    new_config["notification_recipients"] = [
-                        r.strip() for r in recipients.split("\n") if r.strip()
-                    ]
+                    new_config["notification_recipients"] = _clean_lines(recipients)
                     
                     if ConfigComponent.save_config(new_config):
                         if 'app' in st.session_state:
@@ -129,7 +185,7 @@ class ConfigComponent:
                         'fecha_de_firma': '2024-01-01'
                     }]
                     
-                    recipients_list = [r.strip() for r in recipients.split("\n") if r.strip()]
+                    recipients_list = _clean_lines(recipients)
                     if recipients_list:
                         if notify_new_contracts(test_contract, recipients_list):
                             st.success("Notificación de prueba enviada exitosamente")
@@ -2,16 +2,47 @@ import streamlit as st
 import pandas as pd
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter, landscape
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+from reportlab.platypus import SimpleDocTemplate, LongTable, TableStyle, Paragraph, Spacer
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 import io
 import xlsxwriter
 import logging
 from datetime import datetime
+from utils.format_helpers import format_currency_series
 
 logger = logging.getLogger(__name__)
 
+# Columns included in the PDF table, in display order
+PDF_COLUMNS = (
+    'nombre_entidad',
+    'departamento',
+    'tipo_de_contrato',
+    'valor_del_contrato',
+    'fecha_de_firma',
+    'estado_contrato'
+)
+
+# Maximum number of data rows per PDF table flowable
+PDF_TABLE_CHUNK_ROWS = 1000
+
+# Style shared by every PDF table block
+PDF_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+    ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, -1), 10),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+])
+
 class ReportGenerator:
     @staticmethod
     def generate_pdf_report(df, report_type):
@@ -53,48 +84,37 @@ class ReportGenerator:
             # Prepare data for table
             if not df.empty:
                 # Select relevant columns
-                columns = [
-                    'nombre_entidad',
-                    'departamento',
-                    'tipo_de_contrato',
-                    'valor_del_contrato',
-                    'fecha_de_firma',
-                    'estado_contrato'
-                ]
-                columns = [col for col in columns if col in df.columns]
+                present = frozenset(df.columns)
+                columns = [col for col in PDF_COLUMNS if col in present]
                 
-                # Format data
-                table_data = [columns]  # Header row
-                for _, row in df[columns].iterrows():
-                    formatted_row = []
-                    for col in columns:
-                        value = row[col]
-                        if col == 'valor_del_contrato':
-                            value = f"${value:,.0f}" if pd.notnull(value) else "N/A"
-                        elif col == 'fecha_de_firma':
-                            value = value.strftime('%Y-%m-%d') if pd.notnull(value) else "N/A"
-                        formatted_row.append(str(value))
-                    table_data.append(formatted_row)
+                # Format data column by column instead of building a Series per row
+                formatted = pd.DataFrame(index=df.index)
+                for col in columns:
+                    if col == 'valor_del_contrato':
+                        formatted[col] = format_currency_series(df[col], missing="N/A", suffix="")
+                    elif col == 'fecha_de_firma':
+                        dates = df[col]
+                        if not pd.api.types.is_datetime64_any_dtype(dates):
+                            dates = pd.to_datetime(dates, errors='coerce')
+                        formatted[col] = dates.dt.strftime('%Y-%m-%d').fillna("N/A")
+                    else:
+                        formatted[col] = df[col].astype(str)
+                values = formatted[columns].to_numpy(dtype=object)
                 
-                # Create table
-                table = Table(table_data)
-                table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, 0), 12),
-                    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                    ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-                    ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
-                    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                    ('FONTSIZE', (0, 1), (-1, -1), 10),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ]))
+                # Size columns from the longest cell so ReportLab skips its auto-sizing pass
+                lengths = formatted[columns].apply(lambda col: col.str.len().max())
+                lengths = lengths.clip(lower=pd.Series([len(col) for col in columns], index=columns))
+                col_widths = (lengths * 0.08 * inch).clip(0.8 * inch, 2.5 * inch).tolist()
                 
-                story.append(table)
+                # Create tables; LongTable lays out page by page and repeats the header row.
+                # Every page break re-splits the rest of a table, so big reports are cut into
+                # blocks of rows to keep that work bounded per block
+                for start in range(0, len(values), PDF_TABLE_CHUNK_ROWS):
+                    # Slice the object array and convert only this block to lists in C
+                    table = LongTable([columns] + values[start:start + PDF_TABLE_CHUNK_ROWS].tolist(),
+                                      colWidths=col_widths, repeatRows=1)
+                    table.setStyle(PDF_TABLE_STYLE)
+                    story.append(table)
             
             # Build PDF
             doc.build(story)
@@ -109,17 +129,24 @@ class ReportGenerator:
     def generate_excel_report(df, report_type):
         """Generate an Excel report from the dataframe"""
         try:
+            # Whole-peso amounts are written as integers; assign avoids copying the other columns
+            if 'valor_del_contrato' in df.columns:
+                df = df.assign(valor_del_contrato=pd.to_numeric(
+                    df['valor_del_contrato'], downcast='integer'))
+            
             # Create buffer for Excel
             buffer = io.BytesIO()
             
-            # Create Excel writer
-            with pd.ExcelWriter(buffer, engine='xlsxwriter') as writer:
-                # Write data to Excel
-                df.to_excel(writer, sheet_name='Contratos', index=False)
-                
-                # Get workbook and worksheet
+            # Create Excel writer; constant_memory is not usable here because pandas writes
+            # column by column and that mode drops cells of rows it has already flushed
+            with pd.ExcelWriter(
+                buffer,
+                engine='xlsxwriter',
+                engine_kwargs={'options': {'strings_to_urls': False}}
+            ) as writer:
+                # Get workbook and create the worksheet up front
                 workbook = writer.book
-                worksheet = writer.sheets['Contratos']
+                worksheet = workbook.add_worksheet('Contratos')
                 
                 # Add formats
                 header_format = workbook.add_format({
@@ -130,11 +157,14 @@ class ReportGenerator:
                     'border': 1
                 })
                 
-                # Write headers
+                # Write formatted headers and column widths
                 for col_num, value in enumerate(df.columns.values):
                     worksheet.write(0, col_num, value, header_format)
                     worksheet.set_column(col_num, col_num, 15)
                 
+                # Write data to Excel below the header row
+                df.to_excel(writer, sheet_name='Contratos', startrow=1, header=False, index=False)
+                
             buffer.seek(0)
             return buffer
             
@@ -193,10 +223,13 @@ class ReportGenerator:
                         mime="application/pdf"
                     )
                 else:
-                    buffer = ReportGenerator.generate_excel_report(
-                        df,
-                        report_type
-                    )
+                    # Show progress while the workbook is built
+                    with st.status("Generando reporte Excel...") as status:
+                        buffer = ReportGenerator.generate_excel_report(
+                            df,
+                            report_type
+                        )
+                        status.update(label="Reporte Excel generado", state="complete")
                     
                     # Provide download button
                     st.download_button(
@@ -1,29 +1,175 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
+import io
+import hashlib
 import logging
-from utils.format_helpers import format_currency
+from utils.format_helpers import format_currency, format_currency_series
+from utils.data_processor import DataProcessor
 
 logger = logging.getLogger(__name__)
 
-
-def format_url_column(url_text):
-    if pd.isna(url_text):
-        return ""
-    try:
-        # If the URL is already a string, just return it directly
-        if isinstance(url_text, str) and url_text.startswith('http'):
-            return url_text.strip()  # Return clean URL
-        # Try to parse if it's a dictionary string
-        import ast
-        url_dict = ast.literal_eval(url_text)
-        actual_url = url_dict.get('url', '')
-        return actual_url.strip() if actual_url else ""  # Return clean URL
-    except:
-        # If parsing fails, return original text if it looks like a URL
-        if isinstance(url_text, str) and url_text.startswith('http'):
-            return url_text.strip()  # Return clean URL
-        return ""
-
+# Columns with more distinct values than this get a text search instead of a selectbox
+MAX_SELECT_OPTIONS = 1000
+
+# Client-side formatting of the display columns; dates are sent typed, which is smaller
+# over the websocket than preformatted strings. Values are formatted per page by
+# format_display_page: NumberColumn's printf formats can't group thousands
+TABLE_COLUMN_CONFIG = {
+    "Fecha de Firma": st.column_config.DateColumn("Fecha de Firma", format="YYYY-MM-DD"),
+    "Fecha Presentación Oferta": st.column_config.DateColumn(
+        "Fecha Presentación Oferta", format="YYYY-MM-DD"),
+    "URL": st.column_config.LinkColumn("Ver Proceso",
+                                       display_text="Ver en SECOP",
+                                       validate="url")
+}
+
+# Date columns the table filters on or displays
+DATE_COLUMNS = ('fecha_de_firma', 'fecha_de_recepcion_de')
+
+# Rows sent to the browser per table page
+PAGE_SIZE = 200
+
+# Display names for the table columns
+COLUMN_LABELS = {
+    'nombre_entidad': 'Entidad',
+    'departamento': 'Departamento',
+    'tipo_de_contrato': 'Tipo de Contrato',
+    'precio_base': 'Valor (COP)',
+    'fecha_de_recepcion_de': 'Fecha Presentación Oferta',
+    'descripci_n_del_procedimiento': 'Descripción',
+    'valor_del_contrato': 'Valor (COP)',
+    'fecha_de_firma': 'Fecha de Firma',
+    'descripcion_del_proceso': 'Descripción',
+    'estado_contrato': 'Estado',
+    'duracion': 'Duración (días)',
+    'proveedor_adjudicado': 'Proveedor',
+    'documento_proveedor': 'Documento Proveedor',
+    'dias_adicionados': 'Días Adicionados',
+    'modalidad_de_contratacion': 'Modo Contratación',
+    'urlproceso': 'URL'
+}
+
+# Candidate display columns per tab, in display order
+HISTORICAL_DISPLAY_COLUMNS = (
+    'nombre_entidad', 'departamento', 'tipo_de_contrato',
+    'valor_del_contrato', 'fecha_de_firma', 'descripcion_del_proceso',
+    'estado_contrato', 'proveedor_adjudicado', 'documento_proveedor',
+    'dias_adicionados'
+)
+ACTIVE_DISPLAY_COLUMNS = (
+    'nombre_entidad', 'departamento', 'tipo_de_contrato', 'precio_base',
+    'fecha_de_recepcion_de', 'descripci_n_del_procedimiento',
+    'modalidad_de_contratacion', 'urlproceso'
+)
+
+
+def select_filter(df, column, label, key, mask, options=None):
+    """Narrow mask with a selectbox, or with a substring search when the column has too many values"""
+    values = df[column]
+    if options is None:
+        options = DataProcessor.get_filter_options(values[mask])
+    if len(options) <= MAX_SELECT_OPTIONS:
+        selected = st.selectbox(label, ['Todos'] + options, key=key)
+        if selected != 'Todos':
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                # Compare the integer category codes directly instead of going through pandas
+                categories = values.cat.categories
+                # -2 matches no row; missing values carry code -1
+                code = categories.get_loc(selected) if selected in categories else -2
+                mask &= values.cat.codes.to_numpy() == code
+            else:
+                mask &= (values == selected).to_numpy()
+    else:
+        # Shipping thousands of options to the browser on every rerun is slower than searching
+        # A separate key keeps the selectbox's session state value out of the text input
+        query = st.text_input(f"Buscar {label}", key=f"{key}_search")
+        if query:
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                # Search the distinct categories, then match rows by code
+                categories = values.cat.categories
+                matches = categories[categories.astype(str).str.contains(
+                    query, case=False, regex=False)]
+                mask &= values.isin(matches).to_numpy()
+            else:
+                mask &= values.astype(str).str.contains(
+                    query, case=False, na=False, regex=False).to_numpy()
+    return mask
+
+
+def narrow_range(mask, values, low, high, upper=np.less_equal):
+    """AND low <= values and upper(values, high) into mask, reusing one scratch array"""
+    scratch = np.greater_equal(values, low)
+    mask &= scratch
+    upper(values, high, out=scratch)
+    mask &= scratch
+    return mask
+
+
+def value_bounds(values):
+    """Get the (min, max) of a float array, ignoring NaN"""
+    # Not cached: hashing the masked slice would cost as much as the two reductions
+    return float(np.fmin.reduce(values)), float(np.fmax.reduce(values))
+
+
+@st.cache_data(show_spinner=False)  # Reruns that don't touch this table's data skip the sort
+def build_display_frame(df, sort_column, ascending):
+    """Sort and rename the projected display columns of a table"""
+    # Apply sorting if selected, unless the rows already come in that order; the monotonic
+    # checks don't place missing values last like sort_values does (categoricals code them -1)
+    if sort_column:
+        order = df[sort_column]
+        if order.hasnans or not (order.is_monotonic_increasing if ascending
+                                 else order.is_monotonic_decreasing):
+            df = df.sort_values(by=sort_column, ascending=ascending)
+
+    # Rename columns for display; formatting happens per page in format_display_page
+    return df.rename(columns=COLUMN_LABELS, copy=False)
+
+
+def format_display_page(page_df):
+    """Format the rows of a table page that are actually sent to the browser"""
+    # Dates stay typed and are formatted by TABLE_COLUMN_CONFIG
+    formatted = {}
+
+    # Format values as grouped currency, e.g. "$1,234,567 COP"
+    if 'Valor (COP)' in page_df.columns:
+        formatted['Valor (COP)'] = format_currency_series(page_df['Valor (COP)'])
+
+    # Format días adicionados as integer
+    if 'Días Adicionados' in page_df.columns:
+        formatted['Días Adicionados'] = page_df['Días Adicionados'].fillna(0).astype(int)
+
+    # Truncate long descriptions
+    if 'Descripción' in page_df.columns:
+        # Arrow-backed strings let the length check and slice run in C++ kernels
+        descriptions = page_df['Descripción'].astype('string[pyarrow]')
+        too_long = (descriptions.str.len() > 200).fillna(False)
+        formatted['Descripción'] = descriptions.mask(
+            too_long, descriptions.str.slice(0, 200) + '...')
+
+    # assign returns a new frame, so the cached display frame is left untouched
+    return page_df.assign(**formatted) if formatted else page_df
+
+
+@st.cache_data(show_spinner=False)
+def to_csv_bytes(df):
+    """Encode a frame as UTF-8 CSV bytes for download buttons, exactly as df.to_csv writes it"""
+    # pyarrow's CSV writer is not used: it quotes every string and renders floats, booleans
+    # and dates differently, so its files would not match the pandas export
+    return df.to_csv(index=False).encode('utf-8')
+
+
+@st.cache_data(show_spinner=False)
+def to_xlsx_bytes(df):
+    """Encode a frame as an Excel workbook for download buttons using xlsxwriter"""
+    buffer = io.BytesIO()
+    # No constant_memory: pandas writes column by column and that mode drops flushed rows' cells
+    with pd.ExcelWriter(buffer,
+                        engine='xlsxwriter',
+                        engine_kwargs={'options': {'strings_to_urls': False}}) as writer:
+        df.to_excel(writer, sheet_name='Contratos', index=False)
+    return buffer.getvalue()
 
 class TableComponent:
     # First, create a function to extract and format the URL
@@ -33,13 +179,27 @@ class TableComponent:
         """Render an enhanced table with advanced filtering and sorting"""
         try:
             st.subheader(title)
+            # Prefix of this table's widget and session state keys
+            table_key = title.lower()
 
             if df.empty:
                 st.warning("No se encontraron contratos.")
                 return
 
+            # Filtering only drops rows, so the column set is fixed for the whole render
+            columns = set(df.columns)
+
+            # Parse text date columns once so the date filter, bounds and formatting reuse them
+            parsed_dates = {
+                col: pd.to_datetime(df[col], errors='coerce', cache=True)
+                for col in DATE_COLUMNS if col in columns
+                and not pd.api.types.is_datetime64_any_dtype(df[col])
+            }
+            if parsed_dates:
+                df = df.assign(**parsed_dates)
+
             # Add sort state to session state if not exists
-            sort_key = f"{title.lower()}_sort"
+            sort_key = f"{table_key}_sort"
             if sort_key not in st.session_state:
                 st.session_state[sort_key] = {
                     'column':
@@ -50,297 +210,235 @@ class TableComponent:
                     True  # False for descending
                 }
 
-            # Add filters
+            # Domains of the unfiltered data, used while no earlier filter has narrowed the rows
+            domains = DataProcessor.get_filter_domains(
+                df, 'historical' if title == "Contratos Históricos" else 'active')
+
+            # Add filters; each one narrows a single row mask and the frame is sliced once at the end
             st.subheader("Filtros")
+            mask = np.ones(len(df), dtype=bool)
+
+            # Batched in a form so filter widgets rerun the page only on submit
+            with st.form(f"{table_key}_filters"):
+                # Create filter columns based on title
+                if title == "Contratos Históricos":
+                    col1, col2, col3 = st.columns(3)
+                    col4, col5 = st.columns(2)
+
+                    # Entity filter
+                    with col1:
+                        if 'nombre_entidad' in columns:
+                            mask = select_filter(
+                                df, 'nombre_entidad', 'Entidad',
+                                f"{table_key}_nombre_entidad_filter", mask,
+                                domains['options']['nombre_entidad'])
+
+                    # Contract type filter
+                    with col2:
+                        if 'tipo_de_contrato' in columns:
+                            mask = select_filter(
+                                df, 'tipo_de_contrato', 'Tipo de Contrato',
+                                f"{table_key}_tipo_contrato_filter", mask,
+                                domains['options'].get('tipo_de_contrato') if mask.all() else None)
+
+                    # Provider filter
+                    with col3:
+                        if 'proveedor_adjudicado' in columns:
+                            mask = select_filter(
+                                df, 'proveedor_adjudicado', 'Proveedor',
+                                f"{table_key}_proveedor_filter", mask,
+                                domains['options'].get('proveedor_adjudicado') if mask.all() else None)
+
+                    # Value range filter
+                    with col4:
+                        if 'valor_del_contrato' in columns and mask.any():
+                            # Convert once; the same array feeds the slider bounds and the mask
+                            values = df['valor_del_contrato'].to_numpy(
+                                dtype='float64', na_value=np.nan)
+                            min_val, max_val = (
+                                domains['value_ranges']['valor_del_contrato'] if mask.all() else
+                                value_bounds(values[mask]))
+                            min_val, max_val = min_val / 1000000, max_val / 1000000
+                            selected_range = st.slider(
+                                'Valor (COP $Millones)',
+                                min_value=min_val,
+                                max_value=max_val,
+                                value=(min_val, max_val),
+                                format="$%d",
+                                key=f"{table_key}_valor_filter")
+                            mask = narrow_range(mask, values,
+                                                selected_range[0] * 1000000,
+                                                selected_range[1] * 1000000)
+
+                    # Date range filter
+                    with col5:
+                        if 'fecha_de_firma' in columns and mask.any():
+                            min_date, max_date = (
+                                domains['date_ranges']['fecha_de_firma'] if mask.all() else
+                                DataProcessor.get_date_range(df['fecha_de_firma'][mask]))
+                            start_date = st.date_input(
+                                "Fecha Inicial",
+                                value=min_date,
+                                key=f"{table_key}_fecha_inicio_filter")
+                            end_date = st.date_input(
+                                "Fecha Final",
+                                value=max_date,
+                                key=f"{table_key}_fecha_fin_filter")
+                            # Compare datetimes directly; the end date is inclusive
+                            signed = df['fecha_de_firma'].to_numpy()
+                            mask = narrow_range(mask, signed,
+                                                np.datetime64(start_date),
+                                                np.datetime64(end_date) +
+                                                np.timedelta64(1, 'D'),
+                                                upper=np.less)
+                else:
+                    # Default filters for active contracts tab
+                    col1, col2, col3, col4 = st.columns(4)
+
+                    # Department filter
+                    with col1:
+                        if 'departamento' in columns:
+                            mask = select_filter(
+                                df, 'departamento', 'Departamento',
+                                f"{table_key}_departamento_filter", mask,
+                                domains['options']['departamento'])
+
+                    # Contract type filter
+                    with col2:
+                        if 'tipo_de_contrato' in columns:
+                            mask = select_filter(
+                                df, 'tipo_de_contrato', 'Tipo de Contrato',
+                                f"{table_key}_tipo_contrato_filter", mask,
+                                domains['options'].get('tipo_de_contrato') if mask.all() else None)
+
+                    # Value range filter
+                    with col3:
+                        if 'precio_base' in columns and mask.any():
+                            # Convert once; the same array feeds the slider bounds and the mask
+                            values = df['precio_base'].to_numpy(
+                                dtype='float64', na_value=np.nan)
+                            min_val, max_val = (
+                                domains['value_ranges']['precio_base'] if mask.all() else
+                                value_bounds(values[mask]))
+                            min_val, max_val = min_val / 1000000, max_val / 1000000
+                            selected_range = st.slider(
+                                'Valor (COP $Millones)',
+                                min_value=min_val,
+                                max_value=max_val,
+                                value=(min_val, max_val),
+                                format="$%d",
+                                key=f"{table_key}_valor_filter")
+                            mask = narrow_range(mask, values,
+                                                selected_range[0] * 1000000,
+                                                selected_range[1] * 1000000)
+                    with col4:
+                        if 'modalidad_de_contratacion' in columns:
+                            mask = select_filter(
+                                df, 'modalidad_de_contratacion', 'Modo Contratación',
+                                f"{table_key}_modo_contrato_filter", mask,
+                                domains['options'].get('modalidad_de_contratacion') if mask.all() else None)
+
+                st.form_submit_button("Aplicar Filtros")
+
+            # Select the display columns of this tab that exist in the data
+            display_columns = [
+                col for col in (HISTORICAL_DISPLAY_COLUMNS
+                                if title == "Contratos Históricos" else
+                                ACTIVE_DISPLAY_COLUMNS) if col in columns
+            ]
 
-            # Create filter columns based on title
-            if title == "Contratos Históricos":
-                col1, col2, col3 = st.columns(3)
-                col4, col5 = st.columns(2)
-
-                # Entity filter
-                with col1:
-                    if 'nombre_entidad' in df.columns:
-                        entities = ['Todos'] + sorted(
-                            df['nombre_entidad'].unique().tolist())
-                        selected_entity = st.selectbox(
-                            'Entidad',
-                            entities,
-                            key=f"{title.lower()}_nombre_entidad_filter")
-                        if selected_entity != 'Todos':
-                            df = df[df['nombre_entidad'] == selected_entity]
-
-                # Contract type filter
-                with col2:
-                    if 'tipo_de_contrato' in df.columns:
-                        contract_types = ['Todos'] + sorted(
-                            df['tipo_de_contrato'].unique().tolist())
-                        selected_type = st.selectbox(
-                            'Tipo de Contrato',
-                            contract_types,
-                            key=f"{title.lower()}_tipo_contrato_filter")
-                        if selected_type != 'Todos':
-                            df = df[df['tipo_de_contrato'] == selected_type]
-
-                # Provider filter
-                with col3:
-                    if 'proveedor_adjudicado' in df.columns:
-                        providers = ['Todos'] + sorted(
-                            df['proveedor_adjudicado'].unique().tolist())
-                        selected_provider = st.selectbox(
-                            'Proveedor',
-                            providers,
-                            key=f"{title.lower()}_proveedor_filter")
-                        if selected_provider != 'Todos':
-                            df = df[df['proveedor_adjudicado'] ==
-                                    selected_provider]
-
-                # Value range filter
-                with col4:
-                    if 'valor_del_contrato' in df.columns:
-                        min_val = float(
-                            df['valor_del_contrato'].min()) / 1000000
-                        max_val = float(
-                            df['valor_del_contrato'].max()) / 1000000
-                        selected_range = st.slider(
-                            'Valor (COP $Millones)',
-                            min_value=min_val,
-                            max_value=max_val,
-                            value=(min_val, max_val),
-                            format="$%d",
-                            key=f"{title.lower()}_valor_filter")
-                        df = df[
-                            (df['valor_del_contrato'] >= selected_range[0] *
-                             1000000)
-                            & (df['valor_del_contrato'] <= selected_range[1] *
-                               1000000)]
-
-                # Date range filter
-                with col5:
-                    if 'fecha_de_firma' in df.columns:
-                        start_date = st.date_input(
-                            "Fecha Inicial",
-                            value=pd.to_datetime(df['fecha_de_firma']).min(),
-                            key=f"{title.lower()}_fecha_inicio_filter")
-                        end_date = st.date_input(
-                            "Fecha Final",
-                            value=pd.to_datetime(df['fecha_de_firma']).max(),
-                            key=f"{title.lower()}_fecha_fin_filter")
-                        df = df[(pd.to_datetime(df['fecha_de_firma']).dt.date
-                                 >= start_date)
-                                & (pd.to_datetime(df['fecha_de_firma']).dt.date
-                                   <= end_date)]
-            else:
-                # Default filters for active contracts tab
-                col1, col2, col3, col4 = st.columns(4)
-
-                # Department filter
-                with col1:
-                    if 'departamento' in df.columns:
-                        departments = ['Todos'] + sorted(
-                            df['departamento'].unique().tolist())
-                        selected_dept = st.selectbox(
-                            'Departamento',
-                            departments,
-                            key=f"{title.lower()}_departamento_filter")
-                        if selected_dept != 'Todos':
-                            df = df[df['departamento'] == selected_dept]
-
-                # Contract type filter
-                with col2:
-                    if 'tipo_de_contrato' in df.columns:
-                        contract_types = ['Todos'] + sorted(
-                            df['tipo_de_contrato'].unique().tolist())
-                        selected_type = st.selectbox(
-                            'Tipo de Contrato',
-                            contract_types,
-                            key=f"{title.lower()}_tipo_contrato_filter")
-                        if selected_type != 'Todos':
-                            df = df[df['tipo_de_contrato'] == selected_type]
-
-                # Value range filter
-                with col3:
-                    if 'precio_base' in df.columns:
-                        min_val = float(df['precio_base'].min()) / 1000000
-                        max_val = float(df['precio_base'].max()) / 1000000
-                        selected_range = st.slider(
-                            'Valor (COP $Millones)',
-                            min_value=min_val,
-                            max_value=max_val,
-                            value=(min_val, max_val),
-                            format="$%d",
-                            key=f"{title.lower()}_valor_filter")
-                        df = df[(df['precio_base'] >= selected_range[0] *
-                                 1000000)
-                                & (df['precio_base'] <= selected_range[1] *
-                                   1000000)]
-                with col4:
-                    if 'modalidad_de_contratacion' in df.columns:
-                        unique_modes = df['modalidad_de_contratacion'].dropna(
-                        ).unique()
-                        contract_modes = ['Todos'] + sorted(
-                            unique_modes.tolist())
-                        selected_mode = st.selectbox(
-                            'Modo Contratación',
-                            contract_modes,
-                            key=f"{title.lower()}_modo_contrato_filter")
-                        if selected_mode != 'Todos':
-                            df = df[df['modalidad_de_contratacion'] ==
-                                    selected_mode]
-
-            # Select relevant columns with better names
-            column_mapping = {
-                'nombre_entidad': 'Entidad',
-                'departamento': 'Departamento',
-                'tipo_de_contrato': 'Tipo de Contrato',
-                'precio_base': 'Valor (COP)',
-                'fecha_de_recepcion_de': 'Fecha Presentación Oferta',
-                'descripci_n_del_procedimiento': 'Descripción',
-                'valor_del_contrato': 'Valor (COP)',
-                'fecha_de_firma': 'Fecha de Firma',
-                'descripcion_del_proceso': 'Descripción',
-                'estado_contrato': 'Estado',
-                'duracion': 'Duración (días)',
-                'proveedor_adjudicado': 'Proveedor',
-                'documento_proveedor': 'Documento Proveedor',
-                'dias_adicionados': 'Días Adicionados',
-                'modalidad_de_contratacion': 'Modo Contratación',
-                'urlproceso': 'URL'
+            # Sort the whole filtered table server-side; the grid can only reorder the visible page
+            sort_state = st.session_state[sort_key]
+            sort_options = [None] + display_columns
+            sort_col1, sort_col2 = st.columns([3, 1])
+            with sort_col1:
+                sort_column = st.selectbox(
+                    "Ordenar por",
+                    sort_options,
+                    index=sort_options.index(sort_state['column'])
+                    if sort_state['column'] in sort_options else 0,
+                    format_func=lambda col: 'Sin ordenar' if col is None else COLUMN_LABELS[col],
+                    key=f"{table_key}_sort_column")
+            with sort_col2:
+                ascending = st.toggle("Ascendente",
+                                      value=sort_state['direction'],
+                                      key=f"{table_key}_sort_ascending")
+            sort_state = st.session_state[sort_key] = {
+                'column': sort_column,
+                'direction': ascending
             }
 
-            # Select columns based on tab type
-            if title == "Contratos Históricos":
-                display_columns = [
-                    'nombre_entidad', 'departamento', 'tipo_de_contrato',
-                    'valor_del_contrato', 'fecha_de_firma',
-                    'descripcion_del_proceso', 'estado_contrato',
-                    'proveedor_adjudicado', 'documento_proveedor',
-                    'dias_adicionados'
-                ]
+            # Reruns triggered by widgets that don't change the selected rows or the sort
+            # reuse the last filtered and formatted frames and statistics of this session
+            source_file = df.attrs.get('source_file')
+            cache_key = (source_file, len(df),
+                         hashlib.blake2b(mask.tobytes(), digest_size=16).digest(),
+                         sort_state['column'], sort_state['direction'])
+            display_cache_key = f"{table_key}_display_cache"
+            cached = st.session_state.get(display_cache_key)
+            if source_file is not None and cached is not None and cached[0] == cache_key:
+                df, display_df, total_value = cached[1:]
             else:
-                display_columns = [
-                    'nombre_entidad', 'departamento', 'tipo_de_contrato',
-                    'precio_base', 'fecha_de_recepcion_de',
-                    'descripci_n_del_procedimiento',
-                    'modalidad_de_contratacion', 'urlproceso'
-                ]
-
-            # Filter only existing columns
-            display_columns = [
-                col for col in display_columns if col in df.columns
-            ]
-            display_df = df[display_columns].copy()
-
-            # Apply sorting if selected
-            if st.session_state[sort_key]['column']:
-                col = st.session_state[sort_key]['column']
-                ascending = st.session_state[sort_key]['direction']
-                display_df = display_df.sort_values(by=col,
-                                                    ascending=ascending)
-
-            # Rename columns for display
-            display_df.columns = [
-                column_mapping[col] for col in display_columns
-            ]
-
-            # Format the data
-            if 'Valor (COP)' in display_df.columns:
-                display_df['Valor (COP)'] = display_df['Valor (COP)'].apply(
-                    format_currency)
-
-            if 'Fecha de Firma' in display_df.columns:
-                display_df['Fecha de Firma'] = pd.to_datetime(
-                    display_df['Fecha de Firma']).dt.strftime('%Y-%m-%d')
-
-            if 'Fecha Presentación Oferta' in display_df.columns:
-                display_df['Fecha Presentación Oferta'] = pd.to_datetime(
-                    display_df['Fecha Presentación Oferta']).dt.strftime(
-                        '%Y-%m-%d')
-
-            # Format días adicionados as integer
-            if 'Días Adicionados' in display_df.columns:
-                display_df['Días Adicionados'] = display_df[
-                    'Días Adicionados'].fillna(0).astype(int)
-
-            # Truncate long descriptions
-            if 'Descripción' in display_df.columns:
-                display_df['Descripción'] = display_df['Descripción'].apply(
-                    lambda x: x[:200] + '...'
-                    if isinstance(x, str) and len(x) > 200 else x)
-            if 'URL' in display_df.columns:
-                display_df['URL'] = display_df['URL'].apply(format_url_column)
+                df = df[mask]
+                # Project the display columns without copying them out of the filtered frame
+                display_df = build_display_frame(
+                    pd.DataFrame({col: df[col] for col in display_columns}, copy=False),
+                    sort_state['column'], sort_state['direction'])
+                total_value = None
+                if 'Valor (COP)' in display_df.columns:
+                    values = df['precio_base' if title == "Contratos Activos"
+                                else 'valor_del_contrato'].to_numpy(
+                                    dtype='float64', na_value=np.nan)
+                    total_value = np.nansum(values)
+                st.session_state[display_cache_key] = (cache_key, df, display_df,
+                                                       total_value)
 
             # Display table statistics
             st.markdown(f"**Total de Contratos:** {len(display_df)}")
-            if 'Valor (COP)' in display_df.columns:
-                total_value = df['precio_base' if title == "Contratos Activos"
-                                 else 'valor_del_contrato'].sum()
+            if total_value is not None:
                 st.markdown(f"**Valor Total:** {format_currency(total_value)}")
 
-            # Custom CSS for table styling
-            st.markdown("""
-                <style>
-                    .dataframe {
-                        width: 100%;
-                        border-collapse: collapse;
-                    }
-                    .dataframe th {
-                        background-color: #4CAF50;
-                        color: white;
-                        padding: 12px;
-                        text-align: left;
-                        cursor: pointer;
-                    }
-                    .dataframe td {
-                        padding: 8px;
-                        border-bottom: 1px solid #ddd;
-                    }
-                    .dataframe tr:nth-child(even) {
-                        background-color: #f2f2f2;
-                    }
-                    .dataframe tr:hover {
-                        background-color: #ddd;
-                    }
-                    .stButton button {
-                        width: 100%;
-                        padding: 5px;
-                        font-size: 0.8em;
-                        white-space: nowrap;
-                        overflow: hidden;
-                        text-overflow: ellipsis;
-                    }
-                </style>
-            """,
-                        unsafe_allow_html=True)
-
-            # Display the table with HTML
-            # Then, in your table rendering code, process the column
-            if 'URL' in display_df.columns:
-                st.dataframe(display_df,
-                             use_container_width=True,
-                             column_config={
-                                 "URL":
-                                 st.column_config.LinkColumn(
-                                     "Ver Proceso",
-                                     display_text="Ver en SECOP",
-                                     validate="url")
-                             })
-            else:
-                st.dataframe(display_df, use_container_width=True)
+            # Send only the current page of rows to the browser
+            page_count = max(1, -(-len(display_df) // PAGE_SIZE))
+            page_df = display_df
+            if page_count > 1:
+                page_key = f"{table_key}_page"
+                # Filtering can shrink the table below the page kept in session state
+                if st.session_state.get(page_key, 1) > page_count:
+                    st.session_state[page_key] = page_count
+                page = st.number_input(f"Página (de {page_count})",
+                                       min_value=1,
+                                       max_value=page_count,
+                                       step=1,
+                                       key=page_key)
+                page_df = display_df.iloc[(page - 1) * PAGE_SIZE:page * PAGE_SIZE]
+
+            # Display the table; the browser formats values, dates and links
+            st.dataframe(format_display_page(page_df),
+                         use_container_width=True,
+                         column_config=TABLE_COLUMN_CONFIG)
 
             # Export functionality with multiple formats
             st.subheader("Exportar Datos")
             col1, col2 = st.columns(2)
 
-            if st.button("Exportar a CSV", key=f"{title.lower()}_csv_button"):
-                csv = df.to_csv(index=False)
-                st.download_button(
-                    label="Descargar CSV",
-                    data=csv,
-                    file_name=
-                    f"{title.lower().replace(' ', '_')}_{pd.Timestamp.now().strftime('%Y%m%d')}.csv",
-                    mime="text/csv",
-                    key=f"{title.lower()}_csv_download")
+            # Serialize only after an export is requested; the bytes are cached per filtered frame
+            file_stem = f"{table_key.replace(' ', '_')}_{pd.Timestamp.now().strftime('%Y%m%d')}"
+            with col1:
+                if st.button("Exportar a CSV", key=f"{table_key}_csv_button"):
+                    st.download_button(label="Descargar CSV",
+                                       data=to_csv_bytes(df),
+                                       file_name=f"{file_stem}.csv",
+                                       mime="text/csv",
+                                       key=f"{table_key}_csv_download")
+            with col2:
+                if st.button("Exportar a Excel", key=f"{table_key}_xlsx_button"):
+                    st.download_button(
+                        label="Descargar Excel",
+                        data=to_xlsx_bytes(df),
+                        file_name=f"{file_stem}.xlsx",
+                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                        key=f"{table_key}_xlsx_download")
 
         except Exception as e:
             logger.error(f"Error rendering table: {str(e)}")
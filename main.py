@@ -11,18 +11,25 @@ import logging
 import sys
 from styles import apply_custom_styles
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[logging.StreamHandler(sys.stdout)])
-logger = logging.getLogger(__name__)
+
+@st.cache_resource(show_spinner=False)
+def configure_logging():
+    """Configure logging once per process; Streamlit re-executes this script on every rerun"""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[logging.StreamHandler(sys.stdout)])
+
 
 # Page config
 st.set_page_config(page_title="Sistema de Gestión de Contratos de Transporte",
                    page_icon="🚦",
                    layout="wide")
 
+# Configure logging
+configure_logging()
+logger = logging.getLogger(__name__)
+
 
 def load_logo():
     """Load and display the logo"""
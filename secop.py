@@ -12,9 +12,9 @@ import os
 logger = logging.getLogger(__name__)
 
 class SecopDataFetcher:
-    def __init__(self, url: str, is_secop_ii: bool = True):
-        # Load configuration
-        self.config = ConfigComponent.load_config()
+    def __init__(self, url: str, is_secop_ii: bool = True, config: Dict = None):
+        # Load configuration unless the caller already has it
+        self.config = config if config is not None else ConfigComponent.load_config()
         self.url = url
         self.is_secop_ii = is_secop_ii
         self.code_category = self.config.get('codeCategory', 'V1.811022%')
@@ -105,7 +105,7 @@ def process_data(data: List[Dict[str, Any]],
     # Convert date columns
     date_columns = [col for col in df.columns if 'fecha' in col.lower()]
     for col in date_columns:
-        df[col] = pd.to_datetime(df[col], errors='coerce')
+        df[col] = pd.to_datetime(df[col], errors='coerce', format='ISO8601', cache=True)
 
     # Define numeric columns based on SECOP version
     if is_secop_ii:
@@ -135,10 +135,12 @@ def process_data(data: List[Dict[str, Any]],
         if keywords:
             pattern = '|'.join(keywords)
             desc_field = 'descripci_n_del_procedimiento' if is_secop_ii else 'descripcion_del_proceso'
-            df = df[df[desc_field].str.contains(pattern,
-                                            case=False,
-                                            na=False,
-                                            regex=True)]
+            # Arrow-backed strings run the match in Arrow's C++ regex kernel
+            descriptions = df[desc_field].astype('string[pyarrow]')
+            df = df[descriptions.str.contains(pattern,
+                                              case=False,
+                                              na=False,
+                                              regex=True)]
 
     return df
 
@@ -183,9 +185,9 @@ def fetch_and_process_all_data() -> Tuple[pd.DataFrame, pd.DataFrame]:
         config = ConfigComponent.load_config()
         
         secop_ii_open_fetcher = SecopDataFetcher(
-            "https://www.datos.gov.co/resource/p6dx-8zbt.json", True)
+            "https://www.datos.gov.co/resource/p6dx-8zbt.json", True, config)
         secop_ii_closed_fetcher = SecopDataFetcher(
-            "https://www.datos.gov.co/resource/jbjy-vk9h.json", False)
+            "https://www.datos.gov.co/resource/jbjy-vk9h.json", False, config)
 
         # Fetch and process SECOP II data
         print("\nProcessing SECOP II Open data...")
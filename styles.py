@@ -54,5 +54,15 @@ def apply_custom_styles():
         .stTabs [data-baseweb="tab"] {
             font-size: 1.2em;
         }
+        
+        /* Contract table controls; emitted here once per rerun instead of once per table */
+        .stButton button {
+            width: 100%;
+            padding: 5px;
+            font-size: 0.8em;
+            white-space: nowrap;
+            overflow: hidden;
+            text-overflow: ellipsis;
+        }
         </style>
     """, unsafe_allow_html=True)
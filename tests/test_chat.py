@@ -0,0 +1,23 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("google.generativeai")
+
+from components.chat import top_k
+
+
+def test_top_k_matches_nlargest_with_ties():
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        # Small integer counts, like contracts per month, tie often
+        series = pd.Series(rng.integers(0, 6, 20), index=rng.permutation(20))
+
+        for k in (1, 5, 10, 19):
+            pd.testing.assert_series_equal(top_k(series, k), series.nlargest(k))
+
+
+def test_top_k_of_short_series_keeps_ties_in_order():
+    series = pd.Series([2, 5, 2, 5], index=['a', 'b', 'c', 'd'])
+
+    assert top_k(series, 10).index.tolist() == ['b', 'd', 'a', 'c']
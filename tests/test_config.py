@@ -0,0 +1,24 @@
+import pytest
+
+from components.config import ConfigComponent, _DEFAULT_CONFIG, _load_config_cached
+
+
+@pytest.fixture
+def config_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    _load_config_cached.clear()
+    yield tmp_path
+    _load_config_cached.clear()
+
+
+@pytest.mark.parametrize("content", [b"{not json", b"null", b"[1, 2]", b'"text"'])
+def test_invalid_config_file_falls_back_to_defaults(config_dir, content):
+    (config_dir / "config.json").write_bytes(content)
+
+    assert ConfigComponent.load_config() == _DEFAULT_CONFIG
+
+
+def test_config_file_overrides_defaults(config_dir):
+    (config_dir / "config.json").write_bytes(b'{"codeCategory": "V1.81%"}')
+
+    assert ConfigComponent.load_config() == {**_DEFAULT_CONFIG, "codeCategory": "V1.81%"}
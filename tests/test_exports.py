@@ -0,0 +1,52 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+from components.reports import ReportGenerator
+from components.tables import to_csv_bytes, to_xlsx_bytes
+
+
+def make_contracts(rows=50):
+    """Build a contracts frame with the column kinds the exports have to round-trip"""
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'nombre_entidad': pd.Categorical(rng.choice(['Alcaldía', 'Gobernación', 'INVIAS'], rows)),
+        'tipo_de_contrato': rng.choice(['Obra', 'Consultoría'], rows).astype(object),
+        'valor_del_contrato': rng.integers(1_000_000, 5_000_000_000, rows).astype('float64'),
+        'fecha_de_firma': pd.Timestamp('2024-01-01') + pd.to_timedelta(
+            rng.integers(0, 365, rows), unit='D'),
+        'descripcion_del_proceso': [f'Estudio de movilidad, tramo {i}' for i in range(rows)],
+        'urlproceso': [f'https://community.secop.gov.co/Public/Tendering?id={i}'
+                       for i in range(rows)],
+        'dias_adicionados': rng.integers(0, 90, rows).astype('int16'),
+    })
+    df.loc[3, 'descripcion_del_proceso'] = np.nan
+    return df
+
+
+def test_excel_report_keeps_every_cell():
+    df = make_contracts()
+
+    buffer = ReportGenerator.generate_excel_report(df, "Contratos Activos")
+    workbook = pd.read_excel(buffer, sheet_name='Contratos', engine='openpyxl')
+
+    expected = df.assign(nombre_entidad=df['nombre_entidad'].astype(object))
+    pd.testing.assert_frame_equal(workbook, expected, check_dtype=False)
+
+
+def test_table_excel_export_keeps_every_cell():
+    df = make_contracts()
+
+    workbook = pd.read_excel(io.BytesIO(to_xlsx_bytes(df)), sheet_name='Contratos',
+                             engine='openpyxl')
+
+    expected = df.assign(nombre_entidad=df['nombre_entidad'].astype(object))
+    pd.testing.assert_frame_equal(workbook, expected, check_dtype=False)
+
+
+def test_csv_export_matches_pandas():
+    df = make_contracts()
+    df.loc[5, 'valor_del_contrato'] = np.nan
+
+    assert to_csv_bytes(df) == df.to_csv(index=False).encode()
@@ -0,0 +1,12 @@
+import pandas as pd
+
+from components.tables import build_display_frame
+
+
+def test_display_sort_puts_missing_categories_last():
+    df = pd.DataFrame({'nombre_entidad': pd.Categorical([None, 'Alcaldía', 'INVIAS'])})
+
+    display_df = build_display_frame(df, 'nombre_entidad', True)
+
+    assert display_df['Entidad'].tolist()[:2] == ['Alcaldía', 'INVIAS']
+    assert pd.isna(display_df['Entidad'].iloc[-1])
@@ -4,10 +4,34 @@ from datetime import datetime
 import os
 import logging
 from .notifications import notify_new_contracts
+from .format_helpers import extract_urls
 import streamlit as st
 
 logger = logging.getLogger(__name__)
 
+# Repetitive text columns stored as categoricals for cheap distinct values and equality filters
+CATEGORICAL_COLUMNS = (
+    'nombre_entidad', 'departamento', 'tipo_de_contrato',
+    'modalidad_de_contratacion', 'estado_contrato', 'fase', 'proveedor_adjudicado'
+)
+
+# read_csv dtypes that parse those columns straight into categoricals, including the raw
+# SECOP names that process_contracts renames to nombre_entidad, departamento and proveedor_adjudicado
+CSV_CATEGORICAL_DTYPES = {
+    col: 'category' for col in CATEGORICAL_COLUMNS + ('entidad', 'departamento_entidad', 'proveedor')
+}
+
+# Columns whose filter domains are precomputed once per loaded data file: the ones shared
+# by both contract types, plus the extras only the active or historical filters use
+FILTER_OPTION_COLUMNS = ('nombre_entidad', 'departamento', 'tipo_de_contrato')
+FILTER_VALUE_COLUMNS = ('valor_del_contrato',)
+FILTER_DATE_COLUMNS = ('fecha_de_firma',)
+FILTER_EXTRA_COLUMNS = {
+    'active': {'options': ('modalidad_de_contratacion',), 'values': ('precio_base',),
+               'dates': ('fecha_de_publicacion',)},
+    'historical': {'options': ('proveedor_adjudicado',), 'values': (), 'dates': ()}
+}
+
 class DataProcessor:
     @staticmethod
     @st.cache_data(ttl=3600)  # Cache data for 1 hour
@@ -41,8 +65,10 @@ class DataProcessor:
             if active_file:
                 try:
                     logger.info(f"Loading active contracts from: {active_file}")
-                    active_df = pd.read_csv(active_file, encoding='utf-8', low_memory=False)
+                    active_df = pd.read_csv(active_file, encoding='utf-8', low_memory=False,
+                                            dtype=CSV_CATEGORICAL_DTYPES)
                     active_df['tipo'] = 'active'
+                    active_df.attrs['source_file'] = active_file
                     logger.info(f"Successfully loaded {len(active_df)} active contracts")
                 except Exception as e:
                     logger.error(f"Error loading active contracts from {active_file}: {str(e)}")
@@ -51,8 +77,10 @@ class DataProcessor:
             if historical_file:
                 try:
                     logger.info(f"Loading historical contracts from: {historical_file}")
-                    historical_df = pd.read_csv(historical_file, encoding='utf-8', low_memory=False)
+                    historical_df = pd.read_csv(historical_file, encoding='utf-8', low_memory=False,
+                                                dtype=CSV_CATEGORICAL_DTYPES)
                     historical_df['tipo'] = 'historical'
+                    historical_df.attrs['source_file'] = historical_file
                     logger.info(f"Successfully loaded {len(historical_df)} historical contracts")
                 except Exception as e:
                     logger.error(f"Error loading historical contracts from {historical_file}: {str(e)}")
@@ -79,9 +107,6 @@ class DataProcessor:
         try:
             logger.info(f"Starting contract processing for {contract_type} contracts")
             
-            # Create a copy to avoid modifying original
-            df = df.copy()
-
             # Define column mappings
             column_mapping = {
                 'valor_total_adjudicacion': 'valor_del_contrato',
@@ -100,27 +125,47 @@ class DataProcessor:
             # Log available columns for debugging
             logger.debug(f"Available columns in DataFrame: {df.columns.tolist()}")
             
-            # Apply column mapping only for existing columns
+            # Apply column mapping only for existing columns (rename returns a new frame,
+            # so the caller's DataFrame is never modified)
             mapping_columns = {k: v for k, v in column_mapping.items() if k in df.columns}
             df = df.rename(columns=mapping_columns)
             
             # Handle monetary values safely
             if 'valor_del_contrato' in df.columns:
-                df['valor_del_contrato'] = pd.to_numeric(
-                    df['valor_del_contrato'].astype(str).str.replace(r'[^\d.-]', '', regex=True),
-                    errors='coerce'
-                ).fillna(0)
+                values = df['valor_del_contrato']
+                if not pd.api.types.is_numeric_dtype(values):
+                    # Plain numbers parse directly; only cells with currency symbols or
+                    # separators go through the per-cell regex cleanup
+                    parsed = pd.to_numeric(values, errors='coerce')
+                    dirty = parsed.isna() & values.notna()
+                    if dirty.any():
+                        parsed[dirty] = pd.to_numeric(
+                            values[dirty].astype(str).str.replace(r'[^\d.-]', '', regex=True),
+                            errors='coerce')
+                    values = parsed
+                df['valor_del_contrato'] = values.fillna(0).astype('float64')
             
             # Handle date columns
             date_columns = [col for col in df.columns if 'fecha' in col.lower()]
             for col in date_columns:
-                if col in df.columns:
-                    df[col] = pd.to_datetime(df[col], errors='coerce')
+                if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+                    # SECOP exports ISO dates; an explicit format skips per-value inference
+                    df[col] = pd.to_datetime(df[col], errors='coerce', format='ISO8601', cache=True)
             
-            # Handle numerical columns
+            # Handle numerical columns; day counts fit in the smallest integer dtype that holds them
             for col in ['duracion', 'dias_adicionados']:
                 if col in df.columns:
-                    df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype('Int64')
+                    df[col] = pd.to_numeric(
+                        pd.to_numeric(df[col], errors='coerce').fillna(0), downcast='integer')
+            
+            # Normalize process links once at ingest instead of on every table render
+            if 'urlproceso' in df.columns:
+                df['urlproceso'] = extract_urls(df['urlproceso'])
+            
+            # Handle low-cardinality text columns (categories come out lexically sorted)
+            for col in CATEGORICAL_COLUMNS:
+                if col in df.columns and df[col].dtype == object:
+                    df[col] = df[col].astype('category')
             
             # Sort by fecha_de_firma if available
             if 'fecha_de_firma' in df.columns:
@@ -130,6 +175,10 @@ class DataProcessor:
             if 'fecha_de_firma' in df.columns and 'duracion' in df.columns:
                 df['fecha_fin_estimada'] = df['fecha_de_firma'] + pd.to_timedelta(df['duracion'], unit='D')
             
+            # Consolidate the blocks left fragmented by the per-column conversions above so
+            # every column is a contiguous slice of one block per dtype for later reductions
+            df = df.copy()
+            
             if df.empty:
                 logger.warning(f"DataFrame is empty after processing {contract_type} contracts")
             else:
@@ -181,6 +230,59 @@ class DataProcessor:
         except Exception as e:
             logger.error(f"Error in notification process: {str(e)}")
 
+    @staticmethod
+    @st.cache_data(show_spinner=False)  # Recomputed only when the column data changes
+    def get_filter_options(series):
+        """Get the sorted distinct non-null values of a column for filter widgets"""
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # Categories are already unique and sorted; drop the ones filtered out of this slice
+            return series.cat.remove_unused_categories().cat.categories.tolist()
+        # Dedupe and sort in pandas rather than sorting a Python list
+        return series.dropna().drop_duplicates().sort_values().tolist()
+
+    @staticmethod
+    @st.cache_data(show_spinner=False)
+    def get_value_range(series):
+        """Get the (min, max) of a numeric column for range sliders"""
+        values = series.to_numpy(dtype='float64', na_value=np.nan)
+        if not values.size:
+            return np.nan, np.nan
+        return float(np.nanmin(values)), float(np.nanmax(values))
+
+    @staticmethod
+    @st.cache_data(show_spinner=False)
+    def get_date_range(series):
+        """Get the (min, max) of a date column for date pickers"""
+        dates = series if pd.api.types.is_datetime64_any_dtype(series) else pd.to_datetime(
+            series, errors='coerce', cache=True)
+        return dates.min(), dates.max()
+
+    @staticmethod
+    def get_filter_domains(df, contract_type):
+        """Get filter options and bounds of an unfiltered frame, kept in session state per data file"""
+        key = f"filter_domains_{contract_type}"
+        source_file = df.attrs.get('source_file')
+        domains = st.session_state.get(key)
+        if domains is not None and source_file is not None and domains['source_file'] == source_file:
+            return domains
+
+        columns = set(df.columns)
+        extras = FILTER_EXTRA_COLUMNS.get(contract_type, {})
+        domains = {
+            'source_file': source_file,
+            'options': {col: DataProcessor.get_filter_options(df[col])
+                        for col in FILTER_OPTION_COLUMNS + extras.get('options', ())
+                        if col in columns},
+            'value_ranges': {col: DataProcessor.get_value_range(df[col])
+                             for col in FILTER_VALUE_COLUMNS + extras.get('values', ())
+                             if col in columns},
+            'date_ranges': {col: DataProcessor.get_date_range(df[col])
+                            for col in FILTER_DATE_COLUMNS + extras.get('dates', ())
+                            if col in columns}
+        }
+        st.session_state[key] = domains
+        return domains
+
     @staticmethod
     def get_contract_statistics(df):
         """Calculate key statistics for contracts"""
@@ -1,6 +1,7 @@
 import locale
 from typing import Union
 import logging
+import pandas as pd
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +26,23 @@ def format_currency(value: Union[float, int, str]) -> str:
         logger.warning(f"Error formatting currency value '{value}': {str(e)}")
         return "$0 COP"
 
+def format_currency_series(values: pd.Series, missing: str = "No especificado", suffix: str = " COP") -> pd.Series:
+    """Vectorized format_currency for a whole column; missing or non-numeric values become `missing`"""
+    numbers = pd.to_numeric(values, errors='coerce')
+    # Group thousands with a regex over the digit strings instead of formatting each value
+    digits = numbers.abs().round().astype('Int64').astype(str)
+    digits = digits.str.replace(r'\B(?=(\d{3})+(?!\d))', ',', regex=True)
+    formatted = "$" + digits + suffix
+    formatted = formatted.mask(numbers < 0, "-" + formatted)
+    return formatted.where(numbers.notna(), missing)
+
+def extract_urls(urls: pd.Series) -> pd.Series:
+    """Extract clean URLs from plain URL strings or "{'url': ...}" dict strings; anything else becomes empty"""
+    text = urls.astype('string')
+    # Dict-like strings carry the link under the 'url' key, in either quote style
+    extracted = text.str.extract(r"""['"]url['"]\s*:\s*['"]([^'"]*)""", expand=False)
+    return text.where(text.str.startswith('http'), extracted).str.strip().fillna("")
+
 def format_percentage(value: Union[float, int, str], decimal_places: int = 1) -> str:
     """Format a numeric value as a percentage with specified decimal places"""
     try: